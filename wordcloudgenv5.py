@@ -1,11 +1,109 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import font as tkfont
 from ttkthemes import ThemedTk
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud, STOPWORDS
-import threading
+from PIL import Image, ImageDraw, ImageTk
 import json
+import multiprocessing
 import os
+import queue
+import re
+import sys
+from collections import Counter
+from functools import partial
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Read the input corpus with a 256 KiB buffer instead of the default 8 KiB.
+READ_BUFFER_SIZE = 1 << 18
+# The corpus is tokenized in chunks of this many characters so it never sits in memory whole.
+READ_CHUNK_SIZE = 1 << 20
+# zlib level 1 encodes several times faster than the default level 6 for a slightly larger file.
+PNG_SAVE_OPTIONS = {"optimize": False, "compress_level": 1}
+# Tokenizer used to pre-count word frequencies before handing them to WordCloud.
+# Compiled once at import: two or more letters in any script, allowing apostrophes after the first.
+_TOKEN_RE = re.compile(r"[^\W\d_](?:[^\W\d_]|')+", re.UNICODE)
+
+# --- Word Cloud Generation (runs in the worker process) ---
+# Last (exclusion text, stopwords) pair built in this process.
+_stopwords_cache = (None, None)
+
+def _get_stopwords(exclusion_text_raw):
+    """Returns the stopword set for the given exclusion text, reusing the last one if unchanged."""
+    global _stopwords_cache
+    cached_text, cached_stopwords = _stopwords_cache
+    if exclusion_text_raw == cached_text:
+        return cached_stopwords
+
+    from wordcloud import STOPWORDS
+    extra = {w for w in map(str.lower, map(str.strip, exclusion_text_raw.splitlines())) if w}
+    stopwords = frozenset(map(sys.intern, extra | STOPWORDS))
+    _stopwords_cache = (exclusion_text_raw, stopwords)
+    return stopwords
+
+def _iter_words(text, stopwords):
+    # Tokens keep their original case so the most common spelling can be shown later;
+    # they are lowercased one at a time for the stopword check rather than copying the corpus.
+    tokens = _TOKEN_RE.findall(text)
+    # WordCloud drops a trailing possessive "'s" before counting.
+    tokens = (t[:-2] if t.endswith(("'s", "'S")) else t for t in tokens)
+    return (t for t in tokens if t.lower() not in stopwords)
+
+def _split_tail(text):
+    """Splits off the trailing run of word characters, which may continue in the next chunk."""
+    cut = len(text)
+    while cut and (text[cut - 1].isalnum() or text[cut - 1] == "'"):
+        cut -= 1
+    return text[:cut], text[cut:]
+
+def _count_words(chunks, stopwords):
+    """Counts non-stopword tokens across text chunks, then merges plurals and case variants.
+
+    Follows WordCloud.process_text's stopword, possessive and plural handling, but tokenizes with
+    _TOKEN_RE (letters only) instead of WordCloud's regexp.
+    """
+    counts = Counter()
+    carry = ""
+    for chunk in chunks:
+        text, carry = _split_tail(carry + chunk)
+        counts.update(_iter_words(text, stopwords))
+    counts.update(_iter_words(carry, stopwords))
+    return _merge_variants(counts)
+
+def _merge_variants(counts):
+    """Folds case variants and plurals into one entry, as WordCloud.process_tokens does."""
+    variants = {}
+    for word, count in counts.items():
+        variants.setdefault(word.lower(), {})[word] = count
+
+    # "dogs" is merged into "dog" when both appear, but "glass" is never treated as a plural.
+    for key in list(variants):
+        if key.endswith("s") and not key.endswith("ss") and key[:-1] in variants:
+            singular = variants[key[:-1]]
+            for word, count in variants.pop(key).items():
+                singular[word[:-1]] = singular.get(word[:-1], 0) + count
+
+    # Each word is shown in its most common casing with the combined count.
+    return {max(cases.items(), key=itemgetter(1))[0]: sum(cases.values()) for cases in variants.values()}
+
+def _warm_up_worker():
+    """Imports wordcloud in the worker process ahead of the first generation."""
+    import wordcloud
+
+def _generate_wordcloud_worker(input_path, output_path, exclusion_text):
+    from wordcloud import WordCloud
+
+    stopwords = _get_stopwords(exclusion_text)
+
+    with open(input_path, 'r', encoding='utf-8', buffering=READ_BUFFER_SIZE) as file:
+        freqs = _count_words(iter(partial(file.read, READ_CHUNK_SIZE), ""), stopwords)
+
+    # Lay words out on a 1200x600 canvas and let WordCloud render the final image at 2x (2400x1200).
+    wordcloud = WordCloud(background_color="white", width=1200, height=600, scale=2, max_words=200).generate_from_frequencies(freqs)
+
+    wordcloud.to_image().save(output_path, format='PNG', **PNG_SAVE_OPTIONS)
+    return output_path
 
 # --- Custom Rounded Button Widget ---
 class RoundedButton(tk.Canvas):
@@ -15,10 +113,9 @@ class RoundedButton(tk.Canvas):
         padding = kwargs.pop("padding", 10)
         font = kwargs.pop("font", ("Segoe UI", 11, "bold"))
         
-        temp_label = tk.Label(parent, text=text, font=font, padx=padding, pady=padding)
-        width = temp_label.winfo_reqwidth()
-        height = temp_label.winfo_reqheight()
-        temp_label.destroy()
+        measure_font = tkfont.Font(root=parent, font=font)
+        width = measure_font.measure(text) + 2 * padding
+        height = measure_font.metrics("linespace") + 2 * padding
 
         super().__init__(parent, width=width, height=height, borderwidth=0, highlightthickness=0, **kwargs)
 
@@ -33,45 +130,61 @@ class RoundedButton(tk.Canvas):
         self.pressed_color = "#3e8e41"
         self.disabled_color = "#a0a0a0"
 
+        # Pre-rendered background per state, rebuilt only when the size or colors change.
+        self._imgs = {}
+        self._imgs_key = None
+        self._img_id = None
+        self._text_id = None
+        # Pointer-driven state ("normal", "hover" or "pressed"), kept while disabled so redraws restore it.
+        self._state = "normal"
+
         self.bind("<Enter>", self._on_enter)
         self.bind("<Leave>", self._on_leave)
         self.bind("<Button-1>", self._on_press)
         self.bind("<ButtonRelease-1>", self._on_release)
+        self.bind("<Configure>", self._on_configure)
 
-    def draw(self, color=None):
+    def draw(self):
+        # Not laid out yet; <Configure> will call draw again once it has a real size.
         if self.winfo_width() <= 1 or self.winfo_height() <= 1:
-            self.after(10, self.draw)
             return
 
-        self.delete("all")
-        
-        current_color = self.bg_color
-        if self.disabled:
-            current_color = self.disabled_color
-        elif color:
-            current_color = color
-        
-        x1, y1, x2, y2 = 0, 0, self.winfo_width(), self.winfo_height()
-        r = self.radius
-
-        points = [
-            x1 + r, y1, x2 - r, y1, x2, y1, x2, y1 + r, x2, y2 - r, x2, y2,
-            x2 - r, y2, x1 + r, y2, x1, y2, x1, y2 - r, x1, y1 + r, x1, y1,
-        ]
-
-        self.create_polygon(points, fill=current_color, smooth=True)
-        self.create_text(x2 / 2, y2 / 2, text=self.text, font=self.font, fill=self.fg)
+        width, height = self.winfo_width(), self.winfo_height()
+        colors = {"normal": self.bg_color, "hover": self.hover_color, "pressed": self.pressed_color, "disabled": self.disabled_color}
+        key = (width, height, self.radius, tuple(colors.values()))
+        if key != self._imgs_key:
+            self._imgs = {name: self._render_state(width, height, color) for name, color in colors.items()}
+            self._imgs_key = key
+            self.delete("all")
+            self._img_id = self.create_image(0, 0, anchor="nw")
+            self._text_id = self.create_text(width / 2, height / 2, text=self.text, font=self.font)
+
+        self.itemconfig(self._text_id, fill=self.fg)
+        self._show(self._state)
+
+    def _render_state(self, width, height, color):
+        image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        ImageDraw.Draw(image).rounded_rectangle((0, 0, width - 1, height - 1), radius=self.radius, fill=color)
+        return ImageTk.PhotoImage(image, master=self)
+
+    def _show(self, state):
+        """Swaps in the cached image for the given state without redrawing anything."""
+        self._state = state
+        if self._img_id is None:
+            return
+        self.itemconfig(self._img_id, image=self._imgs["disabled" if self.disabled else state])
 
+    def _on_configure(self, event):
+        self.draw()
     def _on_enter(self, event):
-        if not self.disabled: self.draw(self.hover_color)
+        self._show("hover")
     def _on_leave(self, event):
-        if not self.disabled: self.draw()
+        self._show("normal")
     def _on_press(self, event):
-        if not self.disabled: self.draw(self.pressed_color)
+        if not self.disabled: self._show("pressed")
     def _on_release(self, event):
-        if not self.disabled:
-            self.draw(self.hover_color)
-            if self.command: self.command()
+        self._show("hover")
+        if not self.disabled and self.command: self.command()
             
     def configure_colors(self, fg, bg, hover, pressed, disabled, parent_bg):
         self.fg, self.bg_color, self.hover_color, self.pressed_color, self.disabled_color = fg, bg, hover, pressed, disabled
@@ -125,6 +238,7 @@ class WordCloudApp(ThemedTk):
         self.initial_exclusion_list = settings.get("exclusion_list", "\n".join(self.default_exclusion_words))
         is_dark_mode = settings.get("dark_mode", False)
         self.active_theme = self.dark_theme if is_dark_mode else self.light_theme
+        self._theme_apply_pending = False
 
         self.create_widgets()
 
@@ -133,8 +247,18 @@ class WordCloudApp(ThemedTk):
         else:
             self.apply_theme()
 
+        # Settings are only written on close if something changed since they were loaded.
+        self._dirty = False
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
+        # Generation runs in a separate process so it never holds the GUI's GIL.
+        # wordcloud is only imported there; warm it up now so the first click doesn't pay for it.
+        self._executor = self._new_executor()
+
+        # Results come back on the executor's thread; hand them to Tk through a queue polled on the GUI thread.
+        self._result_q = queue.Queue()
+        self._poll_id = self.after(50, self._poll_results)
+
     def create_widgets(self):
         self.main_frame = ttk.Frame(self, padding="15 15 15 15")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -193,6 +317,8 @@ class WordCloudApp(ThemedTk):
         self.exclusion_text = scrolledtext.ScrolledText(self.exclusion_border, wrap=tk.WORD, height=10, width=50, relief=tk.FLAT, font=self.font_style, borderwidth=0, highlightthickness=0)
         self.exclusion_text.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
         self.exclusion_text.insert(tk.INSERT, self.initial_exclusion_list)
+        self.exclusion_text.edit_modified(False)
+        self.exclusion_text.bind("<<Modified>>", self._on_exclusion_modified)
 
         self.generate_button = RoundedButton(self.main_frame, text="3. Generate Word Cloud", command=self.start_generation_thread, font=self.font_style_bold)
         self.generate_button.pack(pady=10)
@@ -201,11 +327,24 @@ class WordCloudApp(ThemedTk):
         self.status_label = ttk.Label(self, text="Ready", relief=tk.SUNKEN, anchor='w', padding=5)
         self.status_label.pack(fill=tk.X, side=tk.BOTTOM)
 
+        # Parallel tuples of themed buttons and the theme key of the background they sit on.
+        self._buttons = (self.input_button, self.output_button, self.generate_button, self.import_button, self.clear_button)
+        self._button_parent_bg_keys = ("text_bg", "text_bg", "bg", "bg", "bg")
+
     def toggle_theme(self):
         self.active_theme = self.dark_theme if self.dark_mode_switch.instate(['selected']) else self.light_theme
+        self._dirty = True
         self.apply_theme()
 
     def apply_theme(self):
+        """Schedules a theme refresh for the next idle point, coalescing repeated requests into one pass."""
+        if self._theme_apply_pending:
+            return
+        self._theme_apply_pending = True
+        self.after_idle(self._apply_theme_now)
+
+    def _apply_theme_now(self):
+        self._theme_apply_pending = False
         theme = self.active_theme
         self.configure(bg=theme["bg"])
         
@@ -236,13 +375,9 @@ class WordCloudApp(ThemedTk):
         )
         self.status_label.configure(background=theme["status_bg"], foreground=theme["fg"])
 
-        for btn, parent_bg_key in [(self.input_button, "text_bg"), 
-                                  (self.output_button, "text_bg"), 
-                                  (self.generate_button, "bg"),
-                                  (self.import_button, "bg"),
-                                  (self.clear_button, "bg")]: # Add new button to theme logic
-            btn.configure_colors(fg=theme["button_fg"], bg=theme["button_bg"], hover=theme["button_hover"], 
-                                 pressed=theme["button_pressed"], disabled=theme["button_disabled"], parent_bg=theme[parent_bg_key])
+        colors = (theme["button_fg"], theme["button_bg"], theme["button_hover"], theme["button_pressed"], theme["button_disabled"])
+        for btn, parent_bg_key in zip(self._buttons, self._button_parent_bg_keys):
+            btn.configure_colors(*colors, parent_bg=theme[parent_bg_key])
 
     def _update_generate_button_state(self):
         if self.input_file_path.get() and self.output_file_path.get():
@@ -289,6 +424,10 @@ class WordCloudApp(ThemedTk):
         """Clears all text from the exclusion list text box."""
         self.exclusion_text.delete("1.0", tk.END)
 
+    def _on_exclusion_modified(self, event):
+        if self.exclusion_text.edit_modified():
+            self._dirty = True
+
     def _load_settings(self):
         try:
             with open(self.settings_path, 'r') as f:
@@ -297,32 +436,98 @@ class WordCloudApp(ThemedTk):
             return {}
 
     def _save_settings(self):
+        if not self._dirty:
+            return
+
         settings = {
             "dark_mode": self.dark_mode_switch.instate(['selected']),
             "exclusion_list": self.exclusion_text.get("1.0", tk.END).strip()
         }
-        with open(self.settings_path, 'w') as f:
-            json.dump(settings, f, indent=4)
+        # Write to a temp file first so a crash mid-write can't truncate the existing settings.
+        tmp_path = self.settings_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', buffering=65536) as f:
+                json.dump(settings, f, indent=4)
+            os.replace(tmp_path, self.settings_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._dirty = False
 
     def _on_closing(self):
-        self._save_settings()
+        # A failed save shouldn't keep the window from closing; the old settings file is left intact.
+        try:
+            self._save_settings()
+        except Exception as e:
+            print(f"Failed to save settings: {e}", file=sys.stderr)
+        self.after_cancel(self._poll_id)
+        self._stop_executor()
         self.destroy()
 
+    def _stop_executor(self):
+        """Kills the worker so a generation in progress neither delays exit nor writes its image after the user quit."""
+        # shutdown() can't interrupt a running task and clears _processes, so grab them first.
+        processes = list((self._executor._processes or {}).values())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _new_executor(self):
+        # "spawn" keeps the worker from inheriting Tk's state and X connection through fork,
+        # and matches how the frozen Windows build starts it.
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        executor.submit(_warm_up_worker)
+        return executor
+
+    def _restart_executor(self):
+        """Replaces a pool whose worker died, since a broken pool rejects every later submit."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+
     def start_generation_thread(self):
         self.status_label.config(text="Status: Processing...")
         self.generate_button.disable()
-        thread = threading.Thread(target=self._threaded_generate, daemon=True)
-        thread.start()
-
-    def _threaded_generate(self):
+        args = (
+            _generate_wordcloud_worker,
+            self.input_file_path.get(),
+            self.output_file_path.get(),
+            self.exclusion_text.get("1.0", tk.END),
+        )
+        try:
+            future = self._executor.submit(*args)
+        except BrokenProcessPool:
+            self._restart_executor()
+            try:
+                future = self._executor.submit(*args)
+            except BrokenProcessPool as e:
+                self.on_generation_complete({"status": "error", "message": str(e)})
+                return
+        future.add_done_callback(self._on_generation_done)
+
+    def _on_generation_done(self, future):
         try:
-            output_path = self.generate_word_cloud()
-            result = {"status": "success", "path": output_path}
+            result = {"status": "success", "path": future.result()}
+        except BrokenProcessPool:
+            result = {"status": "error", "message": "The worker process stopped unexpectedly (it may have run out of memory).", "restart_worker": True}
         except Exception as e:
             result = {"status": "error", "message": str(e)}
-        self.after(0, self.on_generation_complete, result)
+        self._result_q.put(result)
+
+    def _poll_results(self):
+        while True:
+            try:
+                result = self._result_q.get_nowait()
+            except queue.Empty:
+                break
+            self.on_generation_complete(result)
+        self._poll_id = self.after(50, self._poll_results)
 
     def on_generation_complete(self, result):
+        if result.get("restart_worker"):
+            self._restart_executor()
         if result["status"] == "success":
             self.status_label.config(text=f"Status: Success! Saved to {result['path']}")
             messagebox.showinfo("Success", f"Word cloud saved successfully to:\n{result['path']}")
@@ -331,27 +536,8 @@ class WordCloudApp(ThemedTk):
             messagebox.showerror("Error", f"An unexpected error occurred: {result['message']}")
         self._update_generate_button_state()
 
-    def generate_word_cloud(self):
-        input_path = self.input_file_path.get()
-        output_path = self.output_file_path.get()
-        
-        with open(input_path, 'r', encoding='utf-8') as file:
-            text = file.read()
-
-        custom_exclusion_list = [word.strip().lower() for word in self.exclusion_text.get("1.0", tk.END).split("\n") if word.strip()]
-        
-        stopwords = set(STOPWORDS)
-        stopwords.update(custom_exclusion_list)
-
-        wordcloud = WordCloud(stopwords=stopwords, background_color="white", width=1600, height=800, max_words=200, collocations=False).generate(text)
-
-        fig = plt.figure(figsize=(20, 10))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis("off")
-        plt.savefig(output_path, bbox_inches='tight', pad_inches=0)
-        plt.close(fig)
-        return output_path
-
 if __name__ == "__main__":
+    # Needed for the spawned worker process when running as a frozen executable.
+    multiprocessing.freeze_support()
     app = WordCloudApp()
     app.mainloop()